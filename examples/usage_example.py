@@ -4,6 +4,7 @@ Shows how to evaluate LLM answers for trustworthiness.
 """
 import os
 import sys
+import numpy as np
 from dotenv import load_dotenv
 
 # Add parent directory to path for imports
@@ -152,23 +153,26 @@ def main():
     scores = detector.batch_evaluate(qa_pairs, show_progress=True)
     
     print("\nResults:")
-    correct_count = 0
     for (q, a), score in zip(qa_pairs, scores):
         status = get_status_symbol(score)
         confidence = get_confidence_level(score)
-        if score > 0.7:
-            correct_count += 1
         print(f"{status} {q[:40]}... → {a[:20]:<20} Score: {score:.3f} ({confidence})")
     
-    print(f"\nSummary: {correct_count}/{len(qa_pairs)} identified as trustworthy")
+    # Tally the score bands in one vectorized pass
+    score_array = np.asarray(scores)
+    high_count = int((score_array > 0.7).sum())
+    low_count = int((score_array < 0.3).sum())
+    uncertain_count = len(score_array) - high_count - low_count
+    
+    print(f"\nSummary: {high_count}/{len(qa_pairs)} identified as trustworthy")
     
     # Show performance metrics
     print("\n=== Performance Summary ===")
-    print(f"Cache hits: {len(detector._cache) if detector.cache_responses else 0}")
+    print(f"Cache hits: {detector.cache_info().hits}")
     print(f"Score distribution:")
-    print(f"  High confidence (>0.7): {sum(1 for s in scores if s > 0.7)}")
-    print(f"  Low confidence (<0.3): {sum(1 for s in scores if s < 0.3)}")
-    print(f"  Uncertain (0.3-0.7): {sum(1 for s in scores if 0.3 <= s <= 0.7)}")
+    print(f"  High confidence (>0.7): {high_count}")
+    print(f"  Low confidence (<0.3): {low_count}")
+    print(f"  Uncertain (0.3-0.7): {uncertain_count}")
 
 
 def real_world_example():
@@ -1,10 +1,15 @@
 from .detector import TrustworthinessDetector, evaluate_trustworthiness
 from .config import DEFAULT_MODEL, validate_model_api_key
+from .cache import CacheBackend, MemoryCache, DiskCache, RedisCache
 
 __version__ = "0.1.0"
 __all__ = [
     "TrustworthinessDetector", 
     "evaluate_trustworthiness",
     "DEFAULT_MODEL",
-    "validate_model_api_key"
+    "validate_model_api_key",
+    "CacheBackend",
+    "MemoryCache",
+    "DiskCache",
+    "RedisCache"
 ]
@@ -0,0 +1,229 @@
+"""
+Response caches for the trustworthiness detector.
+Caches map a hashed prompt key to a reflection score.
+
+`MemoryCache` is the default. `DiskCache` and `RedisCache` persist scores
+across processes and need the optional `diskcache` / `redis` packages.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple, Optional, Protocol, runtime_checkable
+
+
+class CacheInfo(NamedTuple):
+    """Cache statistics, in the spirit of `functools.lru_cache`."""
+    hits: int
+    misses: int
+    size: int
+    maxsize: Optional[int]
+
+
+@runtime_checkable
+class CacheBackend(Protocol):
+    """Interface for reflection score caches keyed on prompt digests."""
+
+    def get(self, key: bytes) -> Optional[float]:
+        """Return the cached score, or None if missing."""
+        ...
+
+    def set(self, key: bytes, value: float) -> None:
+        """Store a score."""
+        ...
+
+    def clear(self) -> None:
+        """Remove all cached scores."""
+        ...
+
+
+class MemoryCache:
+    """
+    In-memory cache with least-recently-used eviction and a per-entry TTL.
+
+    Keeps memory bounded in long-running services: once `maxsize` entries are
+    stored the least recently used one is evicted, and entries older than
+    `ttl_seconds` are treated as missing. Safe to share between threads.
+    """
+
+    def __init__(self, maxsize: Optional[int] = 10_000, ttl_seconds: Optional[float] = 3600):
+        """
+        Args:
+            maxsize: Maximum number of entries (None for unbounded)
+            ttl_seconds: Seconds before an entry expires (None to never expire)
+        """
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._data = OrderedDict()  # key -> (inserted_at, value)
+        self._lock = threading.Lock()
+
+    def _expired(self, inserted_at: float) -> bool:
+        return self.ttl_seconds is not None and time.monotonic() - inserted_at > self.ttl_seconds
+
+    def get(self, key: bytes) -> Optional[float]:
+        """Return the cached value for `key`, or None if missing or expired."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            if self._expired(entry[0]):
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: bytes, value: float) -> None:
+        """Store `value`, evicting expired and least recently used entries."""
+        with self._lock:
+            self._data[key] = (time.monotonic(), value)
+            self._data.move_to_end(key)
+
+            # Drop expired entries from the cold end, then enforce the size cap
+            while self._data and self._expired(next(iter(self._data.values()))[0]):
+                self._data.popitem(last=False)
+            if self.maxsize is not None:
+                while len(self._data) > self.maxsize:
+                    self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key: bytes) -> bool:
+        entry = self._data.get(key)
+        return entry is not None and not self._expired(entry[0])
+
+    def __getitem__(self, key: bytes) -> float:
+        entry = self._data.get(key)
+        if entry is None or self._expired(entry[0]):
+            raise KeyError(key)
+        return entry[1]
+
+    def __setitem__(self, key: bytes, value: float) -> None:
+        self.set(key, value)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class NullCache:
+    """
+    Cache that stores nothing, used when caching is disabled.
+
+    Lets the detector call the cache unconditionally instead of
+    checking whether caching is on for every prompt.
+    """
+
+    maxsize = 0
+
+    def get(self, key: bytes) -> Optional[float]:
+        return None
+
+    def set(self, key: bytes, value: float) -> None:
+        pass
+
+    def clear(self) -> None:
+        pass
+
+    def __contains__(self, key: bytes) -> bool:
+        return False
+
+    def __getitem__(self, key: bytes) -> float:
+        raise KeyError(key)
+
+    def __setitem__(self, key: bytes, value: float) -> None:
+        pass
+
+    def __len__(self) -> int:
+        return 0
+
+
+class DiskCache:
+    """
+    On-disk cache backed by `diskcache`, shared by every process on the machine.
+
+    Scores survive restarts, so repeated dev runs and CI reruns hit the cache.
+    """
+
+    def __init__(
+        self,
+        directory: str = "~/.cache/trustworthiness",
+        ttl_seconds: Optional[float] = None
+    ):
+        """
+        Args:
+            directory: Cache directory
+            ttl_seconds: Seconds before an entry expires (None to never expire)
+        """
+        try:
+            import diskcache
+        except ImportError as e:
+            raise ImportError("DiskCache requires diskcache: pip install diskcache") from e
+
+        self.ttl_seconds = ttl_seconds
+        self._cache = diskcache.Cache(os.path.expanduser(directory))
+
+    def get(self, key: bytes) -> Optional[float]:
+        return self._cache.get(key)
+
+    def set(self, key: bytes, value: float) -> None:
+        self._cache.set(key, value, expire=self.ttl_seconds)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def close(self) -> None:
+        """Close the underlying database."""
+        self._cache.close()
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+
+class RedisCache:
+    """
+    Redis-backed cache, shared by every worker pointed at the same server.
+
+    Keys are namespaced with `prefix` so `clear` only removes this cache's scores.
+    """
+
+    def __init__(
+        self,
+        client=None,
+        url: str = "redis://localhost:6379/0",
+        ttl_seconds: Optional[int] = 3600,
+        prefix: str = "trustworthiness:"
+    ):
+        """
+        Args:
+            client: Existing `redis.Redis` client (created from `url` if None)
+            url: Redis URL used when no client is given
+            ttl_seconds: Seconds before an entry expires (None to never expire)
+            prefix: Namespace prepended to every key
+        """
+        if client is None:
+            try:
+                import redis
+            except ImportError as e:
+                raise ImportError("RedisCache requires redis: pip install redis") from e
+            client = redis.Redis.from_url(url)
+
+        self.ttl_seconds = ttl_seconds
+        self._client = client
+        self._prefix = prefix.encode()
+
+    def get(self, key: bytes) -> Optional[float]:
+        value = self._client.get(self._prefix + key)
+        return float(value) if value is not None else None
+
+    def set(self, key: bytes, value: float) -> None:
+        self._client.set(self._prefix + key, value, ex=self.ttl_seconds)
+
+    def clear(self) -> None:
+        keys = list(self._client.scan_iter(match=self._prefix + b"*"))
+        if keys:
+            self._client.delete(*keys)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self._client.scan_iter(match=self._prefix + b"*"))
@@ -2,11 +2,56 @@
 Trustworthiness Detector for LLM outputs
 Implements self-reflection certainty from BSDetector paper
 """
+import asyncio
+import hashlib
+import importlib.util
+import logging
+import math
 import re
-from typing import List, Tuple, Optional
-import litellm
+import string
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
+from typing import Callable, List, NamedTuple, Tuple, Optional, Union
+from tqdm.auto import tqdm
+from .cache import CacheBackend, CacheInfo, MemoryCache, NullCache
 from .config import DEFAULT_MODEL, validate_model_api_key
 
+logger = logging.getLogger(__name__)
+
+# Handles formats like "answer: A", "answer: [A]", "answer: (A)"
+_ANSWER_RE = re.compile(r'answer:\s*[\[\(]?([ABC])[\]\)]?', re.IGNORECASE)
+# Handles "item 3 answer: [A]" lines from batched prompts
+_BATCHED_ANSWER_RE = re.compile(r'item\s*(\d+)\s*answer:\s*[\[\(]?([ABC])', re.IGNORECASE)
+# Handles "item 3 first: [A]" / "item 3 second: [A]" lines from batched fused prompts
+_BATCHED_FUSED_ANSWER_RE = re.compile(r'item\s*(\d+)\s*(first|second):\s*[\[\(]?([ABC])', re.IGNORECASE)
+# Handles "first: [A]" / "second: [A]" from the fused prompt
+_FIRST_ANSWER_RE = re.compile(r'first:\s*[\[\(]?([ABC])', re.IGNORECASE)
+_SECOND_ANSWER_RE = re.compile(r'second:\s*[\[\(]?([ABC])', re.IGNORECASE)
+# Handles a bare "A", "[A]" or "(A)" from single-token responses
+_LETTER_RE = re.compile(r'^\W*([ABC])\b', re.IGNORECASE)
+# Read-only so the shared lookup can't be mutated by callers
+_SCORE_MAP = MappingProxyType({'A': 1.0, 'B': 0.0, 'C': 0.5})
+_WHITESPACE_RE = re.compile(r'\s+')
+_PROMPT_FIELDS = ('question', 'answer')
+# Starts the output-format instructions that close every default template
+_OUTPUT_TEMPLATE_MARKER = "The output should strictly use the following template"
+# Providers litellm calls through its own httpx handler, which accepts a pooled
+# AsyncHTTPHandler as `client` (OpenAI-SDK providers expect an SDK client instead)
+_POOLED_PROVIDERS = ('gemini', 'anthropic')
+
+# A prompt template split once into (literal text, field name or None) chunks
+PromptPlan = List[Tuple[str, Optional[str]]]
+
+
+class _ReflectionCall(NamedTuple):
+    """One pending LLM call and the (pair index, prompt index) score cells it fills."""
+    prompt: str
+    cells: List[Tuple[int, int]]
+    cache_keys: List[bytes]
+    stop_pattern: Optional[re.Pattern]
+    parse: Callable[[str], List[Optional[float]]]
+
 
 class TrustworthinessDetector:
     """
@@ -32,12 +77,51 @@ The output should strictly use the following template:
 explanation: [insert analysis], answer: [choose one letter from among choices A through C]"""
     ]
     
+    # Both default reflection questions asked in a single call
+    FUSED_REFLECTION_PROMPT = """Question: {question}
+Proposed Answer: {answer}
+First judgment: Is the proposed answer: (A) Correct (B) Incorrect (C) I am not sure.
+Second judgment: Rethink your first judgment. Are you really sure the proposed answer is correct? 
+Choose again: (A) Correct (B) Incorrect (C) I am not sure.
+The output should strictly use the following template: 
+first explanation: [insert analysis], first: [choose one letter from among choices A through C]
+second explanation: [insert analysis], second: [choose one letter from among choices A through C]"""
+    
+    # Replaces the explanation template when scoring from logprobs
+    LOGPROB_OUTPUT_INSTRUCTION = """Respond with a single letter from among choices A through C.
+Answer letter:"""
+    
+    # Appended after the numbered items when several Q&A pairs share one prompt
+    BATCH_OUTPUT_INSTRUCTION = """Evaluate each of the {count} items above independently.
+For each item i = 1 to {count}, the output should strictly use the following template on its own line: 
+item i explanation: [insert analysis], item i answer: [choose one letter from among choices A through C]"""
+    
+    # Batched counterpart of the fused prompt's output template
+    BATCH_FUSED_OUTPUT_INSTRUCTION = """Evaluate each of the {count} items above independently.
+For each item i = 1 to {count}, the output should strictly use the following template on its own lines: 
+item i first explanation: [insert analysis], item i first: [choose one letter from among choices A through C]
+item i second explanation: [insert analysis], item i second: [choose one letter from among choices A through C]"""
+    
     def __init__(
         self, 
         model: str = None,
         reflection_prompts: Optional[List[str]] = None,
         temperature: float = 0.0,
-        cache_responses: bool = True
+        cache_responses: bool = True,
+        max_concurrency: int = 8,
+        batch_size: int = 5,
+        normalize_cache_keys: bool = False,
+        cache_maxsize: Optional[int] = 10_000,
+        cache_ttl_seconds: Optional[float] = 3600,
+        cache_backend: Optional[CacheBackend] = None,
+        fused_reflection: bool = True,
+        use_logprobs: bool = False,
+        stream_early_exit: bool = True,
+        rpm: Optional[int] = None,
+        tpm: Optional[int] = None,
+        fallback_model: Optional[str] = None,
+        num_retries: int = 3,
+        early_exit: bool = False
     ):
         """
         Initialize the trustworthiness detector.
@@ -47,6 +131,34 @@ explanation: [insert analysis], answer: [choose one letter from among choices A
             reflection_prompts: Custom reflection prompts (uses defaults if None)
             temperature: Temperature for LLM responses (0 for deterministic)
             cache_responses: Whether to cache reflection responses
+            max_concurrency: Max LLM calls in flight at once in batch_evaluate
+            batch_size: Q&A pairs packed into a single reflection prompt in batch_evaluate
+                (1 sends one prompt per pair)
+            normalize_cache_keys: Lowercase and collapse whitespace before hashing cache keys,
+                so trivially different Q&A pairs share cached scores
+            cache_maxsize: Max cached scores before least recently used ones are evicted
+                (None for unbounded)
+            cache_ttl_seconds: Seconds a cached score stays valid (None to never expire)
+            cache_backend: Cache to use instead of the in-memory one, e.g. DiskCache or
+                RedisCache so scores survive process restarts
+            fused_reflection: Ask both default reflection questions in one LLM call.
+                Ignored with custom reflection_prompts; set False for independent calls
+            use_logprobs: Decode a single answer token and score it from the A/B/C
+                token probabilities, giving continuous scores. Needs a provider that
+                returns logprobs (falls back to the decoded letter otherwise). Disables
+                fused and batched prompts, which need more than one output token
+            stream_early_exit: Stream responses and stop reading as soon as the answer
+                letter arrives, skipping the rest of the explanation. Set False for
+                providers that don't support streaming
+            rpm: Requests-per-minute cap for the model (None for no client-side cap)
+            tpm: Tokens-per-minute cap for the model (None for no client-side cap)
+            fallback_model: Model to retry on when the primary model keeps failing
+            num_retries: Retries with backoff for failed LLM calls before scoring them uncertain
+            early_exit: Send the first reflection prompt alone and, if it judges the answer
+                incorrect (B), skip the remaining prompts and score them 0.0 too. Saves
+                calls on clearly wrong answers but changes numeric scores (a B then A
+                pair scores 0.0 instead of 0.5). Needs fused_reflection=False; with fused
+                reflection on (the default) it has no effect and a warning is logged
         """
         # Use configured default if no model specified
         self.model = model or DEFAULT_MODEL
@@ -59,8 +171,123 @@ explanation: [insert analysis], answer: [choose one letter from among choices A
         self.reflection_prompts = reflection_prompts or self.DEFAULT_REFLECTION_PROMPTS
         self.temperature = temperature
         self.cache_responses = cache_responses
-        self._cache = {} if cache_responses else None
+        if cache_responses:
+            self._cache = cache_backend or MemoryCache(cache_maxsize, cache_ttl_seconds)
+        else:
+            self._cache = NullCache()
+        self._cache_hits = 0
+        self._cache_misses = 0
+        self.max_concurrency = max_concurrency
+        self.batch_size = batch_size
+        self.normalize_cache_keys = normalize_cache_keys
+        self.use_logprobs = use_logprobs
+        self.stream_early_exit = stream_early_exit
+        self.early_exit = early_exit
+        # The fused prompt merges the default prompts, so it can't stand in for custom ones
+        self.fused_reflection = fused_reflection and reflection_prompts is None and not use_logprobs
+        if early_exit and self.fused_reflection:
+            logger.warning(
+                "early_exit has no effect with fused_reflection; pass fused_reflection=False to use it"
+            )
+        
+        # Split templates into literal chunks once instead of re-parsing them per call
+        self._compiled_prompts = [_compile_prompt(t) for t in self.reflection_prompts]
+        self._compiled_logprob_prompts = [
+            _compile_prompt(self._logprob_prompt(t)) for t in self.reflection_prompts
+        ]
+        self._compiled_fused_prompt = _compile_prompt(self.FUSED_REFLECTION_PROMPT)
+        # Batched items keep only the question part; one batch-level instruction sets the format
+        self._compiled_batch_prompts = [
+            _compile_prompt(_strip_output_template(t)) for t in self.reflection_prompts
+        ]
+        self._compiled_fused_batch_prompt = _compile_prompt(
+            _strip_output_template(self.FUSED_REFLECTION_PROMPT)
+        )
+        
+        # Route every call through a Router so rate limits, retries and
+        # fallbacks are handled before a failure turns into a 0.5 score
+        self.rpm = rpm
+        self.tpm = tpm
+        self.fallback_model = fallback_model
+        self.num_retries = num_retries
+        # litellm is slow to import, so the router is built on first query
+        self._router = None
+        self._pool_connections = False
+        # Connection pools keyed by the event loop that created them, since
+        # pooled connections can't be used from any other loop
+        self._http_clients = {}
+        # Sync calls from each thread run on that thread's own persistent loop
+        self._thread_state = threading.local()
+        self._sync_loops = []
+        self._executor = None
+        self._lock = threading.Lock()
+        
+    def _get_router(self):
+        """Return the litellm Router, importing litellm and building it on first use."""
+        with self._lock:
+            if self._router is None:
+                self._router = self._build_router()
+        return self._router
+    
+    def _build_router(self):
+        """Build the litellm Router for the primary and fallback models."""
+        import litellm
         
+        models = [self.model] + ([self.fallback_model] if self.fallback_model else [])
+        self._pool_connections = all(_provider(model) in _POOLED_PROVIDERS for model in models)
+        
+        primary_params = {"model": self.model}
+        if self.rpm is not None:
+            primary_params["rpm"] = self.rpm
+        if self.tpm is not None:
+            primary_params["tpm"] = self.tpm
+        
+        model_list = [{"model_name": "primary", "litellm_params": primary_params}]
+        fallbacks = []
+        if self.fallback_model:
+            model_list.append({"model_name": "fallback", "litellm_params": {"model": self.fallback_model}})
+            fallbacks = [{"primary": ["fallback"]}]
+        
+        return litellm.Router(
+            model_list=model_list,
+            fallbacks=fallbacks,
+            num_retries=self.num_retries,
+            retry_after=2,
+            routing_strategy="usage-based-routing-v2"
+        )
+    
+    def _client_kwargs(self) -> dict:
+        """
+        Return the per-call `client` argument for the running loop's connection pool.
+        
+        One keep-alive pool per event loop is shared by every call on that loop,
+        so concurrent batches reuse warm TCP/TLS connections instead of reconnecting.
+        Providers outside `_POOLED_PROVIDERS` keep litellm's own cached clients.
+        """
+        if not self._pool_connections:
+            return {}
+        
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            client = self._http_clients.get(loop)
+            if client is None:
+                import httpx
+                from litellm.llms.custom_httpx.http_handler import AsyncHTTPHandler
+                
+                # Pools of loops that have finished (e.g. earlier asyncio.run calls)
+                # can never be used again, so drop them instead of piling them up
+                for closed_loop in [l for l in self._http_clients if l.is_closed()]:
+                    del self._http_clients[closed_loop]
+                client = AsyncHTTPHandler(
+                    timeout=httpx.Timeout(30.0, connect=5.0),
+                    transport=httpx.AsyncHTTPTransport(
+                        limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+                        http2=importlib.util.find_spec("h2") is not None
+                    )
+                )
+                self._http_clients[loop] = client
+        return {"client": client}
+    
     def get_trustworthiness_score(self, question: str, answer: str) -> float:
         """
         Calculate trustworthiness score for a question-answer pair.
@@ -72,77 +299,486 @@ explanation: [insert analysis], answer: [choose one letter from among choices A
         Returns:
             Trustworthiness score between 0 and 1
         """
-        reflection_scores = self._get_self_reflection_scores(question, answer)
+        return self._run_sync(self.aget_trustworthiness_score(question, answer))
+    
+    async def aget_trustworthiness_score(self, question: str, answer: str) -> float:
+        """Async version of `get_trustworthiness_score`."""
+        reflection_scores = await self._get_self_reflection_scores(question, answer)
         return sum(reflection_scores) / len(reflection_scores)
     
-    def _get_self_reflection_scores(self, question: str, answer: str) -> List[float]:
-        """Get scores from multiple self-reflection prompts."""
-        scores = []
+    async def _get_self_reflection_scores(self, question: str, answer: str) -> List[float]:
+        """
+        Get scores from multiple self-reflection prompts.
         
-        for i, prompt_template in enumerate(self.reflection_prompts):
-            # Format the prompt
-            prompt = prompt_template.format(question=question, answer=answer)
-            
-            # Check cache if enabled
-            cache_key = f"{question}|{answer}|{i}"
-            if self.cache_responses and cache_key in self._cache:
-                score = self._cache[cache_key]
+        The prompts are independent, so every uncached prompt is sent
+        to the LLM concurrently instead of one round-trip after another.
+        """
+        scores = [[None] * len(self.reflection_prompts)]
+        await self._score_pairs([(question, answer)], [[0]], scores)
+        return scores[0]
+    
+    async def _score_pairs(
+        self, 
+        pairs: List[Tuple[str, str]], 
+        units: List[List[int]], 
+        scores: List[List[Optional[float]]], 
+        semaphore: Optional[asyncio.Semaphore] = None,
+        on_pair_done: Optional[Callable[[int], None]] = None
+    ):
+        """
+        Plan and run every LLM call needed to fill `scores`.
+        
+        Each unit is a list of pair indices sharing prompts: one pair is scored
+        on its own, several are packed into batched prompts. `on_pair_done` is
+        called once per pair when its last score is filled.
+        """
+        reported = set()
+        
+        def report(pair_indices):
+            for pair_index in pair_indices:
+                if pair_index not in reported and None not in scores[pair_index]:
+                    reported.add(pair_index)
+                    if on_pair_done is not None:
+                        on_pair_done(pair_index)
+        
+        def on_done(call: _ReflectionCall):
+            report({p for p, _ in call.cells})
+        
+        if not self.early_exit or self.fused_reflection or len(self.reflection_prompts) < 2:
+            calls = self._plan_calls(pairs, units, scores)
+            report(range(len(pairs)))
+            await self._run_calls(calls, scores, semaphore, on_done)
+            return
+        
+        # Early exit: ask the first prompt alone, then skip the rest for confident B's
+        calls = self._plan_calls(pairs, units, scores, prompt_indices=[0])
+        await self._run_calls(calls, scores, semaphore, on_done)
+        
+        incorrect = {p for unit in units for p in unit if scores[p][0] == 0.0}
+        for pair_index in incorrect:
+            scores[pair_index][1:] = [0.0] * (len(scores[pair_index]) - 1)
+        
+        remaining_units = [[p for p in unit if p not in incorrect] for unit in units]
+        rest = list(range(1, len(self.reflection_prompts)))
+        calls = self._plan_calls(
+            pairs, [unit for unit in remaining_units if unit], scores, prompt_indices=rest
+        )
+        report(range(len(pairs)))
+        await self._run_calls(calls, scores, semaphore, on_done)
+    
+    def _plan_calls(
+        self, 
+        pairs: List[Tuple[str, str]], 
+        units: List[List[int]], 
+        scores: List[List[Optional[float]]], 
+        prompt_indices: Optional[List[int]] = None
+    ) -> List[_ReflectionCall]:
+        """Plan the LLM calls for every unit, optionally for a subset of prompts."""
+        calls = []
+        for unit in units:
+            if len(unit) == 1:
+                calls += self._plan_pair_calls(pairs, unit[0], scores, prompt_indices)
             else:
-                # Query LLM
-                response = self._query_llm(prompt)
-                
-                # Parse response to get score
-                score = self._parse_reflection_response(response)
-                
-                # Cache if enabled
-                if self.cache_responses:
-                    self._cache[cache_key] = score
-            
-            scores.append(score)
+                calls += self._plan_batch_calls(pairs, unit, scores, prompt_indices)
+        return calls
+    
+    def _plan_pair_calls(
+        self, 
+        pairs: List[Tuple[str, str]], 
+        pair_index: int, 
+        scores: List[List[Optional[float]]], 
+        prompt_indices: Optional[List[int]] = None
+    ) -> List[_ReflectionCall]:
+        """
+        Plan the LLM calls needed to score one Q&A pair.
+        
+        Cached scores are written straight into `scores`, so known prompts
+        are never scheduled.
+        """
+        question, answer = pairs[pair_index]
+        
+        if self.fused_reflection:
+            cache_keys = [self._cache_key(question, answer, f"fused{i}") for i in range(2)]
+            cached = [self._cache_get(key) for key in cache_keys]
+            if None not in cached:
+                scores[pair_index][:] = cached
+                return []
+            prompt = _render_prompt(self._compiled_fused_prompt, question, answer)
+            return [_ReflectionCall(
+                prompt, [(pair_index, 0), (pair_index, 1)], cache_keys,
+                _SECOND_ANSWER_RE, lambda response: list(self._parse_fused_response(response, default=None))
+            )]
+        
+        if self.use_logprobs:
+            plans, key_prefix = self._compiled_logprob_prompts, "logprobs"
+        else:
+            plans, key_prefix = self._compiled_prompts, ""
+        
+        calls = []
+        for i in prompt_indices or range(len(plans)):
+            plan = plans[i]
+            cache_key = self._cache_key(question, answer, f"{key_prefix}{i}")
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                scores[pair_index][i] = cached
+            else:
+                calls.append(_ReflectionCall(
+                    _render_prompt(plan, question, answer), [(pair_index, i)], [cache_key],
+                    _ANSWER_RE, lambda response: [self._parse_reflection_response(response, default=None)]
+                ))
+        return calls
+    
+    def _plan_batch_calls(
+        self, 
+        pairs: List[Tuple[str, str]], 
+        pair_indices: List[int], 
+        scores: List[List[Optional[float]]], 
+        prompt_indices: Optional[List[int]] = None
+    ) -> List[_ReflectionCall]:
+        """
+        Plan one LLM call per reflection prompt for a chunk of Q&A pairs.
+        
+        Per-item scores share the cache with the single-pair path. With
+        `fused_reflection`, both judgments for every item come from one call.
+        """
+        if self.fused_reflection:
+            return self._plan_fused_batch_calls(pairs, pair_indices, scores)
+        
+        calls = []
+        for i in prompt_indices or range(len(self._compiled_batch_prompts)):
+            plan = self._compiled_batch_prompts[i]
+            uncached = []
+            for pair_index in pair_indices:
+                question, answer = pairs[pair_index]
+                cache_key = self._cache_key(question, answer, i)
+                cached = self._cache_get(cache_key)
+                if cached is not None:
+                    scores[pair_index][i] = cached
+                else:
+                    uncached.append((pair_index, cache_key))
+            if uncached:
+                count = len(uncached)
+                prompt = self._batched_reflection_prompt(plan, [pairs[p] for p, _ in uncached])
+                calls.append(_ReflectionCall(
+                    prompt, [(p, i) for p, _ in uncached], [key for _, key in uncached],
+                    _batched_stop_pattern(count),
+                    lambda response, count=count: self._parse_batched_response(response, count, default=None)
+                ))
+        return calls
+    
+    def _plan_fused_batch_calls(
+        self, 
+        pairs: List[Tuple[str, str]], 
+        pair_indices: List[int], 
+        scores: List[List[Optional[float]]]
+    ) -> List[_ReflectionCall]:
+        """Plan one fused LLM call asking both judgments for a chunk of Q&A pairs."""
+        uncached = []
+        for pair_index in pair_indices:
+            question, answer = pairs[pair_index]
+            cache_keys = [self._cache_key(question, answer, f"fused{i}") for i in range(2)]
+            cached = [self._cache_get(key) for key in cache_keys]
+            if None not in cached:
+                scores[pair_index][:] = cached
+            else:
+                uncached.append((pair_index, cache_keys))
+        if not uncached:
+            return []
+        
+        count = len(uncached)
+        prompt = self._batched_reflection_prompt(
+            self._compiled_fused_batch_prompt, [pairs[p] for p, _ in uncached],
+            self.BATCH_FUSED_OUTPUT_INSTRUCTION
+        )
+        return [_ReflectionCall(
+            prompt, [(p, i) for p, _ in uncached for i in range(2)],
+            [key for _, keys in uncached for key in keys],
+            _batched_stop_pattern(count, "second"),
+            lambda response: self._parse_batched_fused_response(response, count, default=None)
+        )]
+    
+    async def _run_calls(
+        self, 
+        calls: List[_ReflectionCall], 
+        scores: List[List[Optional[float]]], 
+        semaphore: Optional[asyncio.Semaphore] = None,
+        on_done: Optional[Callable[[_ReflectionCall], None]] = None
+    ):
+        """
+        Run planned calls concurrently, filling and caching their score cells.
+        
+        Every call is an independent task, optionally gated by `semaphore`,
+        so no call waits on another call for the same pair. Cells left unscored
+        by a failed call or an unparseable answer are filled with 0.5 but not
+        cached, so the next request retries them.
+        """
+        async def run(call: _ReflectionCall):
+            if semaphore is None:
+                call_scores = await self._run_call(call)
+            else:
+                async with semaphore:
+                    call_scores = await self._run_call(call)
+            if call_scores is None:
+                call_scores = [None] * len(call.cells)
+            for (pair_index, i), cache_key, score in zip(call.cells, call.cache_keys, call_scores):
+                if score is None:
+                    score = 0.5
+                else:
+                    self._cache_put(cache_key, score)
+                scores[pair_index][i] = score
+            if on_done is not None:
+                on_done(call)
+        
+        await asyncio.gather(*(run(call) for call in calls))
+    
+    async def _run_call(self, call: _ReflectionCall) -> Optional[List[Optional[float]]]:
+        """
+        Query the LLM for one planned call and score the response.
+        
+        Returns None if the call failed, and None for each cell whose
+        answer couldn't be parsed.
+        """
+        if self.use_logprobs:
+            return [await self._aquery_logprob_score(call.prompt)]
+        response = await self._aquery_llm(call.prompt, stop_pattern=call.stop_pattern)
+        if response is None:
+            return None
+        return call.parse(response)
+    
+    def _cache_key(
+        self, 
+        question: str, 
+        answer: str, 
+        prompt_index: Union[int, str]
+    ) -> bytes:
+        """
+        Build a fixed-size cache key for one reflection prompt of a Q&A pair.
+        
+        Hashing keeps entries small no matter how long the question and answer are.
+        The model and temperature are part of the key so persistent caches never
+        return scores produced under different settings.
+        """
+        if self.normalize_cache_keys:
+            question = _WHITESPACE_RE.sub(' ', question).strip().lower()
+            answer = _WHITESPACE_RE.sub(' ', answer).strip().lower()
+        key = f"{self.model}\0{self.temperature}\0{prompt_index}\0{question}\0{answer}".encode()
+        return hashlib.blake2b(key, digest_size=16).digest()
+    
+    def _cache_get(self, key: bytes) -> Optional[float]:
+        """Return the cached score for `key`, or None if it is missing."""
+        score = self._cache.get(key)
+        if score is None:
+            self._cache_misses += 1
+        else:
+            self._cache_hits += 1
+        return score
+    
+    def _cache_put(self, key: bytes, score: float):
+        """Cache a score (a no-op when caching is disabled)."""
+        self._cache.set(key, score)
+    
+    async def _aquery_llm(self, prompt: str, stop_pattern: Optional[re.Pattern] = None) -> Optional[str]:
+        """
+        Query the LLM with error handling.
+        
+        With `stream_early_exit`, the response is streamed and the request is
+        closed as soon as `stop_pattern` matches what has arrived so far.
+        
+        Returns:
+            The response text, or None if the call failed
+        """
+        stream = self.stream_early_exit and stop_pattern is not None
+        try:
+            response = await self._get_router().acompletion(
+                model="primary",
+                messages=[{"role": "user", "content": prompt}],
+                temperature=self.temperature,
+                stream=stream,
+                **self._client_kwargs()
+            )
+            if not stream:
+                return response.choices[0].message.content
             
-        return scores
+            text = ""
+            async for chunk in response:
+                text += chunk.choices[0].delta.content or ""
+                if stop_pattern.search(text):
+                    # Only the answer letter is scored, so skip the rest of the decode
+                    aclose = getattr(response, "aclose", None)
+                    if aclose is not None:
+                        await aclose()
+                    break
+            return text
+        except Exception as e:
+            logger.warning("LLM query failed: %s", e)
+            return None
     
-    def _query_llm(self, prompt: str) -> str:
-        """Query the LLM with error handling."""
+    async def _aquery_logprob_score(self, prompt: str) -> Optional[float]:
+        """
+        Query the LLM for a single answer token and score it from its logprobs.
+        
+        Returns None if the call failed or no answer letter came back.
+        """
         try:
-            response = litellm.completion(
-                model=self.model,
+            response = await self._get_router().acompletion(
+                model="primary",
                 messages=[{"role": "user", "content": prompt}],
-                temperature=self.temperature
+                temperature=self.temperature,
+                max_tokens=1,
+                logprobs=True,
+                top_logprobs=5,
+                # Providers without logprobs (e.g. gemini, anthropic) reject these params
+                # outright; dropping them lets the decoded-letter fallback below run
+                drop_params=True,
+                **self._client_kwargs()
             )
-            return response.choices[0].message.content
         except Exception as e:
-            print(f"Warning: LLM query failed: {e}")
-            # Return a response that will be parsed as uncertain
-            return "answer: [C]"
+            logger.warning("LLM query failed: %s", e)
+            return None
+        
+        score = self._score_from_logprobs(response)
+        if score is None:
+            # Provider didn't return logprobs, so score the decoded letter
+            content = response.choices[0].message.content or ""
+            match = _LETTER_RE.search(content)
+            if match is None:
+                logger.warning("Could not parse response: %.100s...", content)
+                return None
+            score = _SCORE_MAP[match.group(1).upper()]
+        return score
     
-    def _parse_reflection_response(self, response: str) -> float:
+    def _score_from_logprobs(self, response) -> Optional[float]:
+        """
+        Convert the first token's top logprobs into a continuous score.
+        
+        Returns P(A) + 0.5 * P(C), renormalized over the A/B/C tokens,
+        or None if the response has no usable logprobs.
+        """
+        try:
+            top_logprobs = response.choices[0].logprobs.content[0].top_logprobs
+            probs = {}
+            for entry in top_logprobs:
+                letter = entry.token.strip(" [(").upper()
+                if letter in _SCORE_MAP:
+                    probs[letter] = probs.get(letter, 0.0) + math.exp(entry.logprob)
+        except (AttributeError, IndexError, KeyError, TypeError):
+            return None
+        
+        total = sum(probs.values())
+        if not total:
+            return None
+        return sum(_SCORE_MAP[letter] * p for letter, p in probs.items()) / total
+    
+    def _parse_reflection_response(self, response: str, default: Optional[float] = 0.5) -> Optional[float]:
         """
         Parse LLM response to extract choice and convert to score.
         
         Returns:
             1.0 for (A) Correct
             0.0 for (B) Incorrect  
-            0.5 for (C) I am not sure or parsing failure
+            0.5 for (C) I am not sure
+            `default` (0.5 unless given) on parsing failure
         """
-        # Look for the answer pattern
-        # Handles formats like "answer: A", "answer: [A]", "answer: (A)"
-        pattern = r'answer:\s*[\[\(]?([ABC])[\]\)]?'
-        match = re.search(pattern, response, re.IGNORECASE)
+        match = _ANSWER_RE.search(response)
         
         if match:
-            choice = match.group(1).upper()
-            score_map = {'A': 1.0, 'B': 0.0, 'C': 0.5}
-            return score_map.get(choice, 0.5)
+            return _SCORE_MAP[match.group(1).upper()]
         else:
             # If we can't parse, default to uncertain
-            print(f"Warning: Could not parse response: {response[:100]}...")
-            return 0.5
+            logger.warning("Could not parse response: %.100s...", response)
+            return default
+    
+    def _parse_fused_response(
+        self, 
+        response: str, 
+        default: Optional[float] = 0.5
+    ) -> Tuple[Optional[float], Optional[float]]:
+        """
+        Parse a fused reflection response into its two scores.
+        
+        Each judgment that can't be parsed gets `default` (0.5, uncertain).
+        """
+        matches = [_FIRST_ANSWER_RE.search(response), _SECOND_ANSWER_RE.search(response)]
+        if None in matches:
+            logger.warning("Could not parse response: %.100s...", response)
+        
+        first, second = (_SCORE_MAP[m.group(1).upper()] if m else default for m in matches)
+        return first, second
+    
+    def _logprob_prompt(self, prompt_template: str) -> str:
+        """Swap a template's explanation-and-answer instructions for a bare answer letter."""
+        return _strip_output_template(prompt_template) + "\n" + self.LOGPROB_OUTPUT_INSTRUCTION
+    
+    def _batched_reflection_prompt(
+        self, 
+        plan: PromptPlan, 
+        items: List[Tuple[str, str]],
+        output_instruction: Optional[str] = None
+    ) -> str:
+        """
+        Pack several Q&A pairs into one reflection prompt as numbered items.
+        
+        `plan` should be a template without its own output instructions, so the
+        batch-level instruction is the only output format the model sees.
+        """
+        blocks = [
+            f"Item {n}:\n" + _render_prompt(plan, question, answer)
+            for n, (question, answer) in enumerate(items, 1)
+        ]
+        blocks.append((output_instruction or self.BATCH_OUTPUT_INSTRUCTION).format(count=len(items)))
+        return "\n\n".join(blocks)
+    
+    def _parse_batched_response(
+        self, 
+        response: str, 
+        count: int, 
+        default: Optional[float] = 0.5
+    ) -> List[Optional[float]]:
+        """
+        Parse a batched reflection response into one score per item.
+        
+        Items the model skipped or answered unparseably get `default` (0.5).
+        """
+        scores = [None] * count
+        
+        for index, choice in _BATCHED_ANSWER_RE.findall(response):
+            index = int(index)
+            if 1 <= index <= count:
+                scores[index - 1] = _SCORE_MAP[choice.upper()]
+        
+        if None in scores:
+            logger.warning("Could not parse response: %.100s...", response)
+        return [default if score is None else score for score in scores]
+    
+    def _parse_batched_fused_response(
+        self, 
+        response: str, 
+        count: int, 
+        default: Optional[float] = 0.5
+    ) -> List[Optional[float]]:
+        """
+        Parse a batched fused response into first and second scores per item.
+        
+        Scores are returned flat as [item 1 first, item 1 second, item 2 first, ...];
+        judgments the model skipped get `default` (0.5).
+        """
+        scores = [None] * (2 * count)
+        
+        for index, judgment, choice in _BATCHED_FUSED_ANSWER_RE.findall(response):
+            index = int(index)
+            if 1 <= index <= count:
+                offset = 0 if judgment.lower() == "first" else 1
+                scores[2 * (index - 1) + offset] = _SCORE_MAP[choice.upper()]
+        
+        if None in scores:
+            logger.warning("Could not parse response: %.100s...", response)
+        return [default if score is None else score for score in scores]
     
     def batch_evaluate(
         self, 
         qa_pairs: List[Tuple[str, str]], 
-        show_progress: bool = True
+        show_progress: bool = True,
+        max_concurrency: Optional[int] = None
     ) -> List[float]:
         """
         Evaluate multiple question-answer pairs.
@@ -150,28 +786,191 @@ explanation: [insert analysis], answer: [choose one letter from among choices A
         Args:
             qa_pairs: List of (question, answer) tuples
             show_progress: Whether to show progress
+            max_concurrency: Max LLM calls in flight (defaults to the detector's setting)
             
         Returns:
             List of trustworthiness scores
         """
-        scores = []
+        return self._run_sync(self.abatch_evaluate(qa_pairs, show_progress, max_concurrency))
+    
+    async def abatch_evaluate(
+        self, 
+        qa_pairs: List[Tuple[str, str]], 
+        show_progress: bool = True,
+        max_concurrency: Optional[int] = None
+    ) -> List[float]:
+        """
+        Async version of `batch_evaluate`.
         
-        for i, (question, answer) in enumerate(qa_pairs):
-            if show_progress:
-                print(f"Evaluating {i+1}/{len(qa_pairs)}...", end='\r')
-            
-            score = self.get_trustworthiness_score(question, answer)
-            scores.append(score)
+        Duplicate pairs are evaluated once. Pairs are packed `batch_size` at a
+        time into shared reflection prompts, and every resulting LLM call across
+        all pairs and prompts is scheduled as one flat task list, bounded by a
+        semaphore so the provider is not flooded with unbounded fan-out.
+        """
+        # Evaluate each distinct pair once, then scatter scores back in input order
+        unique_index = {}
+        order = [unique_index.setdefault(tuple(pair), len(unique_index)) for pair in qa_pairs]
+        unique_pairs = list(unique_index)
+        
+        # Logprob scoring reads a single output token, so it can't cover several pairs
+        batch_size = 1 if self.use_logprobs else max(1, self.batch_size)
+        scores = [[None] * len(self.reflection_prompts) for _ in unique_pairs]
+        units = [
+            list(range(start, min(start + batch_size, len(unique_pairs))))
+            for start in range(0, len(unique_pairs), batch_size)
+        ]
+        
+        semaphore = asyncio.Semaphore(max_concurrency or self.max_concurrency)
+        with tqdm(total=len(unique_pairs), desc="Evaluating", disable=not show_progress) as progress:
+            await self._score_pairs(
+                unique_pairs, units, scores, semaphore,
+                on_pair_done=lambda _: progress.update(1)
+            )
+        
+        unique_scores = [sum(pair_scores) / len(pair_scores) for pair_scores in scores]
+        scores = [unique_scores[i] for i in order]
         
         if show_progress:
-            print(f"Evaluated {len(qa_pairs)} Q&A pairs.    ")
+            print(f"Evaluated {len(qa_pairs)} Q&A pairs.")
             
         return scores
     
+    def cache_info(self) -> CacheInfo:
+        """Return cache hits, misses, current size and max size."""
+        size = len(self._cache) if hasattr(self._cache, "__len__") else 0
+        maxsize = getattr(self._cache, "maxsize", None)
+        return CacheInfo(self._cache_hits, self._cache_misses, size, maxsize)
+    
     def clear_cache(self):
         """Clear the response cache."""
-        if self._cache is not None:
-            self._cache.clear()
+        self._cache.clear()
+        self._cache_hits = 0
+        self._cache_misses = 0
+    
+    def _run_sync(self, coro):
+        """
+        Run a coroutine to completion from synchronous code.
+        
+        Each calling thread gets its own persistent event loop, so pooled
+        connections are reused across calls and concurrent threads can share
+        one detector.
+        """
+        return self._outside_running_loop(lambda: self._thread_loop().run_until_complete(coro))
+    
+    def _outside_running_loop(self, fn: Callable):
+        """
+        Call `fn` where no event loop is running.
+        
+        From inside a running loop (e.g. Jupyter), where another loop can't be
+        entered, `fn` runs on a dedicated worker thread that keeps its own loop
+        and connection pool across calls.
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return fn()
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1)
+            executor = self._executor
+        return executor.submit(fn).result()
+    
+    def _thread_loop(self) -> asyncio.AbstractEventLoop:
+        """Return the calling thread's event loop for sync calls, creating it on first use."""
+        loop = getattr(self._thread_state, "loop", None)
+        if loop is None or loop.is_closed():
+            loop = asyncio.new_event_loop()
+            self._thread_state.loop = loop
+            with self._lock:
+                self._sync_loops.append(loop)
+        return loop
+    
+    async def aclose(self):
+        """Close the running event loop's HTTP connection pool."""
+        with self._lock:
+            client = self._http_clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.close()
+    
+    def close(self):
+        """
+        Close every connection pool, and the event loops used by sync calls.
+        
+        Call it once no other thread is still using the detector.
+        """
+        self._outside_running_loop(self._close_loops_and_pools)
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown()
+    
+    def _close_loops_and_pools(self):
+        """Close each sync-call loop with its pool, then the pools left on other loops."""
+        with self._lock:
+            loops, self._sync_loops = self._sync_loops, []
+        for loop in loops:
+            if not loop.is_closed():
+                loop.run_until_complete(self.aclose())
+                loop.close()
+        
+        with self._lock:
+            clients, self._http_clients = self._http_clients, {}
+        for loop, client in clients.items():
+            # A pool on a closed loop can't be awaited any more and is just dropped
+            if loop.is_running():
+                asyncio.run_coroutine_threadsafe(client.close(), loop)
+            elif not loop.is_closed():
+                loop.run_until_complete(client.close())
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+
+
+def _strip_output_template(template: str) -> str:
+    """Cut a template's output-format instructions, keeping the question part."""
+    if _OUTPUT_TEMPLATE_MARKER in template:
+        template = template[:template.index(_OUTPUT_TEMPLATE_MARKER)]
+    return template.rstrip()
+
+
+def _provider(model: str) -> Optional[str]:
+    """Return litellm's provider name for `model`, or None if it can't tell."""
+    import litellm
+    try:
+        return litellm.get_llm_provider(model)[1]
+    except Exception:
+        return None
+
+
+def _batched_stop_pattern(count: int, label: str = "answer") -> re.Pattern:
+    """Match the final `label` line of the last item in a batched response."""
+    return re.compile(rf'item\s*{count}\s*{label}:\s*[\[\(]?[ABC]', re.IGNORECASE)
+
+
+def _compile_prompt(template: str) -> PromptPlan:
+    """
+    Split a prompt template into literal chunks and {question}/{answer} fields.
+    
+    Raises:
+        ValueError: If the template uses any other placeholder, or a conversion
+            or format spec such as {answer!r} or {question:>40}
+    """
+    plan = []
+    for literal, field, spec, conversion in string.Formatter().parse(template):
+        if field is not None and (field not in _PROMPT_FIELDS or spec or conversion):
+            placeholder = field + (f"!{conversion}" if conversion else "") + (f":{spec}" if spec else "")
+            raise ValueError(f"Unsupported placeholder {{{placeholder}}} in reflection prompt")
+        plan.append((literal, field))
+    return plan
+
+
+def _render_prompt(plan: PromptPlan, question: str, answer: str) -> str:
+    """Fill a compiled prompt template with a question and answer."""
+    fields = {'question': question, 'answer': answer}
+    return ''.join(literal + fields[field] if field else literal for literal, field in plan)
 
 
 # Convenience function for quick evaluation
@@ -192,4 +991,7 @@ def evaluate_trustworthiness(
         Trustworthiness score between 0 and 1
     """
     detector = TrustworthinessDetector(model=model)
-    return detector.get_trustworthiness_score(question, answer)
+    try:
+        return detector.get_trustworthiness_score(question, answer)
+    finally:
+        detector.close()
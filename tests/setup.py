@@ -8,5 +8,11 @@ setup(
     install_requires=[
         "litellm",
         "python-dotenv>=1.0.0",
+        "tqdm",
+        "httpx",
     ],
+    extras_require={
+        "disk": ["diskcache"],
+        "redis": ["redis"],
+    },
 )
\ No newline at end of file
@@ -3,9 +3,10 @@ Test suite for the Trustworthiness Detector.
 Tests core functionality and edge cases.
 """
 import pytest
+import asyncio
 import os
 import sys
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import Mock, patch, MagicMock, AsyncMock
 
 # Add parent directory to path
 #sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -13,6 +14,20 @@ from unittest.mock import Mock, patch, MagicMock
 from src.trustworthiness import TrustworthinessDetector, evaluate_trustworthiness, DEFAULT_MODEL
 from src.trustworthiness.prompts import REFLECTION_PROMPTS
 from src.trustworthiness.config import validate_model_api_key
+from src.trustworthiness.cache import CacheBackend, DiskCache, NullCache
+from src.trustworthiness.detector import _ANSWER_RE
+
+
+def mock_llm_response(content):
+    """Build a mock litellm response that works both as a completion and as a stream."""
+    response = MagicMock()
+    response.choices = [Mock(message=Mock(content=content))]
+    response.__aiter__.return_value = [
+        Mock(choices=[Mock(delta=Mock(content=content[i:i + 8]))])
+        for i in range(0, len(content), 8)
+    ]
+    response.aclose = AsyncMock()
+    return response
 
 
 class TestTrustworthinessDetector:
@@ -38,7 +53,7 @@ class TestTrustworthinessDetector:
         assert detector.model == "gemini/gemini-pro"
         assert detector.temperature == 0.5
         assert detector.cache_responses == False
-        assert detector._cache is None
+        assert isinstance(detector._cache, NullCache)
     
     def test_default_model(self):
         """Test that default model is set correctly."""
@@ -69,15 +84,14 @@ class TestTrustworthinessDetector:
         assert detector.reflection_prompts == custom_prompts
         assert len(detector.reflection_prompts) == 2
     
-    @patch('litellm.completion')
+    @patch('litellm.acompletion')
     def test_get_trustworthiness_score(self, mock_completion):
         """Test the main scoring function."""
         # Mock LLM responses
-        mock_response = Mock()
-        mock_response.choices = [Mock(message=Mock(content="explanation: The answer is correct. answer: [A]"))]
+        mock_response = mock_llm_response("explanation: The answer is correct. answer: [A]")
         mock_completion.return_value = mock_response
         
-        detector = TrustworthinessDetector(model="gemini/gemini-pro")
+        detector = TrustworthinessDetector(model="gemini/gemini-pro", fused_reflection=False)
         score = detector.get_trustworthiness_score("What is 2+2?", "4")
         
         # Should be called twice (for 2 reflection prompts)
@@ -85,35 +99,144 @@ class TestTrustworthinessDetector:
         # Score should be 1.0 (both responses are A = correct)
         assert score == 1.0
     
-    @patch('litellm.completion')
+    @patch('litellm.acompletion')
     def test_mixed_confidence_responses(self, mock_completion):
         """Test with mixed confidence responses."""
         # First call returns "correct", second returns "not sure"
         mock_completion.side_effect = [
-            Mock(choices=[Mock(message=Mock(content="answer: [A]"))]),  # Correct
-            Mock(choices=[Mock(message=Mock(content="answer: [C]"))]),  # Not sure
+            mock_llm_response("answer: [A]"),  # Correct
+            mock_llm_response("answer: [C]"),  # Not sure
         ]
         
-        detector = TrustworthinessDetector(model="gemini/gemini-pro")
+        detector = TrustworthinessDetector(model="gemini/gemini-pro", fused_reflection=False)
         score = detector.get_trustworthiness_score("What is 2+2?", "4")
         
         # Score should be (1.0 + 0.5) / 2 = 0.75
         assert score == 0.75
     
-    @patch('litellm.completion')
+    @patch('litellm.acompletion')
     def test_incorrect_answer_detection(self, mock_completion):
         """Test detection of incorrect answers."""
         # Both responses say incorrect
-        mock_response = Mock()
-        mock_response.choices = [Mock(message=Mock(content="answer: [B]"))]
+        mock_response = mock_llm_response("answer: [B]")
         mock_completion.return_value = mock_response
         
-        detector = TrustworthinessDetector(model="gemini/gemini-pro")
+        detector = TrustworthinessDetector(model="gemini/gemini-pro", fused_reflection=False)
         score = detector.get_trustworthiness_score("What is 2+2?", "5")
         
         # Score should be 0.0 (both responses are B = incorrect)
         assert score == 0.0
     
+    @patch('litellm.acompletion')
+    def test_async_trustworthiness_score(self, mock_completion):
+        """Test the async scoring function dispatches all prompts."""
+        mock_completion.return_value = mock_llm_response("answer: [A]")
+        
+        detector = TrustworthinessDetector(model="gemini/gemini-pro", fused_reflection=False)
+        score = asyncio.run(detector.aget_trustworthiness_score("What is 2+2?", "4"))
+        
+        assert mock_completion.call_count == 2
+        assert score == 1.0
+    
+    @patch('litellm.acompletion')
+    def test_fused_reflection(self, mock_completion):
+        """Test that both reflection judgments come from a single call by default."""
+        mock_completion.return_value = mock_llm_response(
+            "first explanation: looks right, first: [A]\nsecond explanation: unsure, second: [C]"
+        )
+        
+        detector = TrustworthinessDetector(model="gemini/gemini-pro")
+        score = detector.get_trustworthiness_score("What is 2+2?", "4")
+        
+        assert mock_completion.call_count == 1
+        assert score == 0.75
+        
+        # Custom prompts can't be fused
+        detector = TrustworthinessDetector(reflection_prompts=["{question} {answer}"])
+        assert detector.fused_reflection == False
+    
+    def test_parse_fused_response(self):
+        """Test fused response parsing, including a missing judgment."""
+        detector = TrustworthinessDetector()
+        
+        assert detector._parse_fused_response("first: A, second: (B)") == (1.0, 0.0)
+        assert detector._parse_fused_response("First: [C]") == (0.5, 0.5)
+        assert detector._parse_fused_response("second: A") == (0.5, 1.0)
+    
+    @patch('litellm.acompletion')
+    def test_logprob_scoring(self, mock_completion):
+        """Test continuous scores from single-token logprobs."""
+        import math
+        top_logprobs = [
+            Mock(token="A", logprob=math.log(0.6)),
+            Mock(token="C", logprob=math.log(0.2)),
+            Mock(token="B", logprob=math.log(0.1)),
+            Mock(token="The", logprob=math.log(0.1)),
+        ]
+        response = Mock()
+        response.choices = [Mock(logprobs=Mock(content=[Mock(top_logprobs=top_logprobs)]))]
+        mock_completion.return_value = response
+        
+        detector = TrustworthinessDetector(model="gemini/gemini-pro", use_logprobs=True)
+        score = detector.get_trustworthiness_score("What is 2+2?", "4")
+        
+        # (0.6 * 1.0 + 0.2 * 0.5) / 0.9, for both prompts
+        assert score == pytest.approx(0.7 / 0.9)
+        assert mock_completion.call_count == 2
+        assert mock_completion.call_args.kwargs["max_tokens"] == 1
+        prompt = mock_completion.call_args.kwargs["messages"][0]["content"]
+        assert prompt.endswith("Answer letter:")
+        assert "explanation" not in prompt
+    
+    @patch('litellm.acompletion')
+    def test_logprob_fallback_without_logprobs(self, mock_completion):
+        """Test that the decoded letter is used when logprobs are missing."""
+        mock_completion.return_value = Mock(choices=[Mock(message=Mock(content="B"), logprobs=None)])
+        
+        detector = TrustworthinessDetector(model="gemini/gemini-pro", use_logprobs=True)
+        
+        assert detector.get_trustworthiness_score("What is 2+2?", "5") == 0.0
+    
+    @patch('litellm.acompletion')
+    def test_logprob_fallback_unsupported_params(self, mock_completion):
+        """Test that providers rejecting logprob params still score the decoded letter."""
+        import litellm
+        
+        async def reject_logprobs(**kwargs):
+            # Mirrors litellm for gemini/anthropic, which raise unless unsupported params are dropped
+            if "top_logprobs" in kwargs and not kwargs.get("drop_params"):
+                raise litellm.UnsupportedParamsError(
+                    "gemini does not support parameters: ['top_logprobs']", llm_provider="gemini"
+                )
+            return Mock(choices=[Mock(message=Mock(content="A"), logprobs=None)])
+        mock_completion.side_effect = reject_logprobs
+        
+        detector = TrustworthinessDetector(model="gemini/gemini-pro", use_logprobs=True, num_retries=0)
+        
+        assert detector.get_trustworthiness_score("What is 2+2?", "4") == 1.0
+        assert mock_completion.call_args.kwargs["drop_params"] == True
+    
+    @patch('litellm.acompletion')
+    def test_stream_early_exit(self, mock_completion):
+        """Test that streaming stops once the answer letter arrives."""
+        response = mock_llm_response("explanation: fine, answer: [A] and some trailing text to skip")
+        mock_completion.return_value = response
+        
+        detector = TrustworthinessDetector(model="gemini/gemini-pro")
+        text = asyncio.run(detector._aquery_llm("prompt", stop_pattern=_ANSWER_RE))
+        
+        assert mock_completion.call_args.kwargs["stream"] == True
+        assert "answer: [A" in text
+        assert "trailing" not in text
+        response.aclose.assert_awaited_once()
+        
+        # Without early exit the full completion is returned
+        detector = TrustworthinessDetector(model="gemini/gemini-pro", stream_early_exit=False)
+        text = asyncio.run(detector._aquery_llm("prompt", stop_pattern=_ANSWER_RE))
+        
+        assert mock_completion.call_args.kwargs["stream"] == False
+        assert text.endswith("trailing text to skip")
+    
     def test_parse_reflection_response(self):
         """Test response parsing with various formats."""
         detector = TrustworthinessDetector()
@@ -137,11 +260,18 @@ class TestTrustworthinessDetector:
             score = detector._parse_reflection_response(response)
             assert score == expected_score, f"Failed for response: {response}"
     
-    @patch('litellm.completion')
+    def test_score_map_is_read_only(self):
+        """Test that the shared score lookup can't be mutated."""
+        from src.trustworthiness.detector import _SCORE_MAP
+        
+        with pytest.raises(TypeError):
+            _SCORE_MAP['A'] = 0.0
+        assert _SCORE_MAP['A'] == 1.0
+    
+    @patch('litellm.acompletion')
     def test_caching_functionality(self, mock_completion):
         """Test that caching works correctly."""
-        mock_response = Mock()
-        mock_response.choices = [Mock(message=Mock(content="answer: [A]"))]
+        mock_response = mock_llm_response("first: [A], second: [A]")
         mock_completion.return_value = mock_response
         
         detector = TrustworthinessDetector(
@@ -160,12 +290,143 @@ class TestTrustworthinessDetector:
         assert mock_completion.call_count == initial_call_count
         assert score1 == score2
         assert len(detector._cache) > 0
+        
+        info = detector.cache_info()
+        assert info.hits == 2
+        assert info.misses == 2
+        assert info.size == 2
+    
+    @patch('litellm.acompletion')
+    def test_failures_are_not_cached(self, mock_completion):
+        """Test that failed calls and unparseable answers score 0.5 without being cached."""
+        mock_completion.side_effect = [
+            Exception("outage"),
+            mock_llm_response("first: [A], no second judgment"),
+            mock_llm_response("first: [A], second: [A]"),
+        ]
+        
+        detector = TrustworthinessDetector(model="gemini/gemini-pro", num_retries=0)
+        
+        assert detector.get_trustworthiness_score("What is 2+2?", "4") == 0.5
+        assert len(detector._cache) == 0
+        # The parsed first judgment is cached, the defaulted second one isn't
+        assert detector.get_trustworthiness_score("What is 2+2?", "4") == 0.75
+        assert len(detector._cache) == 1
+        assert detector.get_trustworthiness_score("What is 2+2?", "4") == 1.0
+        assert mock_completion.call_count == 3
+        
+        assert detector.get_trustworthiness_score("What is 2+2?", "4") == 1.0
+        assert mock_completion.call_count == 3
+    
+    def test_memory_cache_shared_between_threads(self):
+        """Test that concurrent gets and evicting sets on one MemoryCache don't raise."""
+        from concurrent.futures import ThreadPoolExecutor
+        from src.trustworthiness.cache import MemoryCache
+        cache = MemoryCache(maxsize=8, ttl_seconds=0.0001)
+        
+        def hammer(seed):
+            for i in range(2000):
+                key = str((seed + i) % 16).encode()
+                cache.set(key, 1.0)
+                cache.get(key)
+        
+        # Switch threads as often as possible so unlocked races would surface
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            with ThreadPoolExecutor(max_workers=4) as pool:
+                list(pool.map(hammer, range(4)))
+        finally:
+            sys.setswitchinterval(interval)
+        
+        assert len(cache) <= 8
+    
+    def test_cache_eviction_and_expiry(self):
+        """Test that the cache evicts least recently used and expired entries."""
+        detector = TrustworthinessDetector(cache_maxsize=2, cache_ttl_seconds=60)
+        cache = detector._cache
+        
+        with patch('src.trustworthiness.cache.time.monotonic', return_value=0.0):
+            cache.set(b"a", 1.0)
+            cache.set(b"b", 0.0)
+            assert cache.get(b"a") == 1.0  # "a" is now most recently used
+            cache.set(b"c", 0.5)
+        
+        assert len(cache) == 2
+        assert b"b" not in cache
+        
+        with patch('src.trustworthiness.cache.time.monotonic', return_value=61.0):
+            assert cache.get(b"a") is None
+            assert cache.get(b"c") is None
+        
+        assert len(cache) == 0
+    
+    @patch('litellm.acompletion')
+    def test_custom_cache_backend(self, mock_completion):
+        """Test that a custom cache backend is shared across detectors."""
+        mock_completion.return_value = mock_llm_response("answer: [A]")
+        
+        class DictCache:
+            def __init__(self):
+                self.data = {}
+            def get(self, key):
+                return self.data.get(key)
+            def set(self, key, value):
+                self.data[key] = value
+            def clear(self):
+                self.data.clear()
+        
+        backend = DictCache()
+        assert isinstance(backend, CacheBackend)
+        
+        TrustworthinessDetector(model="gemini/gemini-pro", cache_backend=backend, fused_reflection=False) \
+            .get_trustworthiness_score("What is 2+2?", "4")
+        assert mock_completion.call_count == 2
+        assert len(backend.data) == 2
+        
+        # A fresh detector (e.g. a new process) reuses the stored scores
+        detector = TrustworthinessDetector(model="gemini/gemini-pro", cache_backend=backend, fused_reflection=False)
+        assert detector.get_trustworthiness_score("What is 2+2?", "4") == 1.0
+        assert mock_completion.call_count == 2
+        
+        # Changing the temperature changes the cache key
+        TrustworthinessDetector(model="gemini/gemini-pro", temperature=0.5, cache_backend=backend,
+                                fused_reflection=False) \
+            .get_trustworthiness_score("What is 2+2?", "4")
+        assert mock_completion.call_count == 4
     
-    @patch('litellm.completion')
+    def test_disk_cache(self, tmp_path):
+        """Test that DiskCache persists scores across instances."""
+        pytest.importorskip("diskcache")
+        
+        cache = DiskCache(directory=str(tmp_path))
+        cache.set(b"key", 0.5)
+        cache.close()
+        
+        cache = DiskCache(directory=str(tmp_path))
+        assert cache.get(b"key") == 0.5
+        assert cache.get(b"missing") is None
+        cache.clear()
+        assert len(cache) == 0
+        cache.close()
+    
+    def test_cache_key(self):
+        """Test that cache keys are fixed-size digests, optionally normalized."""
+        detector = TrustworthinessDetector()
+        key = detector._cache_key("What is 2+2?", "4" * 4096, 0)
+        
+        assert isinstance(key, bytes)
+        assert len(key) == 16
+        assert key != detector._cache_key("What is 2+2?", "4" * 4096, 1)
+        assert detector._cache_key("What is  2+2?", "Four", 0) != detector._cache_key("what is 2+2?", "four", 0)
+        
+        detector = TrustworthinessDetector(normalize_cache_keys=True)
+        assert detector._cache_key("What is  2+2?", "Four", 0) == detector._cache_key("what is 2+2?", "four ", 0)
+    
+    @patch('litellm.acompletion')
     def test_batch_evaluate(self, mock_completion):
         """Test batch evaluation functionality."""
-        mock_response = Mock()
-        mock_response.choices = [Mock(message=Mock(content="answer: [A]"))]
+        mock_response = mock_llm_response("answer: [A]")
         mock_completion.return_value = mock_response
         
         detector = TrustworthinessDetector(model="gemini/gemini-pro")
@@ -182,18 +443,380 @@ class TestTrustworthinessDetector:
         assert all(isinstance(s, float) for s in scores)
         assert all(0 <= s <= 1 for s in scores)
     
-    @patch('litellm.completion')
+    @patch('litellm.acompletion')
+    def test_batch_evaluate_deduplicates_pairs(self, mock_completion):
+        """Test that repeated pairs in a batch are evaluated once."""
+        def fake_completion(**kwargs):
+            prompt = kwargs["messages"][0]["content"]
+            return mock_llm_response("first: [A], second: [A]" if "Jupiter" in prompt
+                                     else "first: [B], second: [B]")
+        
+        mock_completion.side_effect = fake_completion
+        
+        detector = TrustworthinessDetector(
+            model="gemini/gemini-pro",
+            cache_responses=False,
+            batch_size=1
+        )
+        qa_pairs = [
+            ("What is the largest planet?", "Jupiter"),
+            ("What is the largest planet?", "Earth"),
+            ("What is the largest planet?", "Jupiter"),
+            ["What is the largest planet?", "Earth"],
+        ]
+        
+        scores = detector.batch_evaluate(qa_pairs, show_progress=False)
+        
+        assert scores == [1.0, 0.0, 1.0, 0.0]
+        assert mock_completion.call_count == 2
+    
+    @patch('litellm.acompletion')
+    def test_batch_evaluate_concurrency_limit(self, mock_completion):
+        """Test that batch evaluation never exceeds max_concurrency LLM calls."""
+        in_flight = 0
+        peak = 0
+        
+        async def fake_completion(**kwargs):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return mock_llm_response("answer: [A]")
+        
+        mock_completion.side_effect = fake_completion
+        
+        detector = TrustworthinessDetector(
+            model="gemini/gemini-pro",
+            cache_responses=False,
+            batch_size=1,
+            fused_reflection=False
+        )
+        qa_pairs = [(f"What is {i}+{i}?", str(2 * i)) for i in range(6)]
+        
+        scores = detector.batch_evaluate(qa_pairs, show_progress=False, max_concurrency=2)
+        
+        assert scores == [1.0] * 6
+        assert mock_completion.call_count == 12
+        assert peak == 2
+    
+    @patch('litellm.acompletion')
+    def test_batched_prompting(self, mock_completion):
+        """Test that batch evaluation packs several pairs into one prompt."""
+        def fake_completion(**kwargs):
+            prompt = kwargs["messages"][0]["content"]
+            count = prompt.count("Proposed Answer:")
+            # Second item of every batch is judged incorrect, fifth is skipped
+            lines = [f"item {n} explanation: ok, item {n} answer: [{'B' if n == 2 else 'A'}]"
+                     for n in range(1, count + 1) if n != 5]
+            return mock_llm_response("\n".join(lines))
+        
+        mock_completion.side_effect = fake_completion
+        
+        detector = TrustworthinessDetector(
+            model="gemini/gemini-pro",
+            batch_size=5,
+            fused_reflection=False
+        )
+        qa_pairs = [(f"What is {i}+{i}?", str(2 * i)) for i in range(7)]
+        
+        scores = detector.batch_evaluate(qa_pairs, show_progress=False)
+        
+        # 2 batches (5 + 2 pairs) x 2 reflection prompts
+        assert mock_completion.call_count == 4
+        assert scores == [1.0, 0.0, 1.0, 1.0, 0.5, 1.0, 0.0]
+        
+        # Per-item scores are cached for the single-pair path
+        assert detector.get_trustworthiness_score("What is 1+1?", "2") == 0.0
+        assert mock_completion.call_count == 4
+    
+    @patch('litellm.acompletion')
+    def test_batched_fused_prompting(self, mock_completion):
+        """Test that batches ask both fused judgments in one prompt and share the fused cache."""
+        def fake_completion(**kwargs):
+            prompt = kwargs["messages"][0]["content"]
+            count = prompt.count("Proposed Answer:")
+            # First item is judged correct then unsure, the rest correct twice
+            lines = [f"item {n} first: [A]\nitem {n} second: [{'C' if n == 1 else 'A'}]"
+                     for n in range(1, count + 1)]
+            return mock_llm_response("\n".join(lines))
+        
+        mock_completion.side_effect = fake_completion
+        
+        detector = TrustworthinessDetector(model="gemini/gemini-pro", batch_size=3)
+        qa_pairs = [(f"What is {i}+{i}?", str(2 * i)) for i in range(4)]
+        
+        scores = detector.batch_evaluate(qa_pairs, show_progress=False)
+        
+        # One fused call per batch (3 + 1 pairs), including the leftover single pair
+        assert mock_completion.call_count == 2
+        assert scores == [0.75, 1.0, 1.0, 0.75]
+        assert "item i second:" in mock_completion.call_args_list[0].kwargs["messages"][0]["content"]
+        
+        # Scores are cached under the same keys as the single-pair fused path
+        assert detector.get_trustworthiness_score("What is 1+1?", "2") == 1.0
+        assert mock_completion.call_count == 2
+    
+    @patch('litellm.acompletion')
+    def test_failed_fused_call_skips_parsing(self, mock_completion, caplog):
+        """Test that a failed fused call scores uncertain without a parse warning."""
+        mock_completion.side_effect = Exception("API Error")
+        
+        detector = TrustworthinessDetector(model="gemini/gemini-pro", num_retries=0)
+        with caplog.at_level("WARNING", logger="src.trustworthiness.detector"):
+            assert detector.get_trustworthiness_score("What is 2+2?", "4") == 0.5
+            assert detector.batch_evaluate([("Q1", "A1"), ("Q2", "A2")], show_progress=False) == [0.5, 0.5]
+        
+        messages = [record.getMessage() for record in caplog.records]
+        assert not any(m.startswith("Could not parse") for m in messages)
+    
+    @patch('litellm.acompletion')
+    def test_early_exit(self, mock_completion):
+        """Test that a confident B from the first prompt skips the second."""
+        mock_completion.side_effect = [
+            mock_llm_response("answer: [B]"),
+            mock_llm_response("answer: [A]"),
+            mock_llm_response("answer: [C]"),
+        ]
+        
+        detector = TrustworthinessDetector(
+            model="gemini/gemini-pro",
+            fused_reflection=False,
+            early_exit=True
+        )
+        
+        assert detector.get_trustworthiness_score("What is 2+2?", "5") == 0.0
+        assert mock_completion.call_count == 1
+        
+        assert detector.get_trustworthiness_score("What is 2+2?", "4") == 0.75
+        assert mock_completion.call_count == 3
+    
+    def test_early_exit_with_fused_reflection_warns(self, caplog):
+        """Test that early_exit warns when fused reflection leaves it without effect."""
+        with caplog.at_level("WARNING", logger="src.trustworthiness.detector"):
+            TrustworthinessDetector(early_exit=True)
+            assert "early_exit has no effect" in caplog.text
+            
+            caplog.clear()
+            TrustworthinessDetector(early_exit=True, fused_reflection=False)
+            assert caplog.text == ""
+    
+    @patch('litellm.acompletion')
+    def test_early_exit_batched(self, mock_completion):
+        """Test that batched second prompts only include pairs not judged incorrect."""
+        prompts = []
+        
+        def fake_completion(**kwargs):
+            prompt = kwargs["messages"][0]["content"]
+            prompts.append(prompt)
+            count = prompt.count("Proposed Answer:")
+            lines = [f"item {n} answer: [{'B' if 'wrong' in prompt.split('Item ')[n] else 'A'}]"
+                     for n in range(1, count + 1)]
+            return mock_llm_response("\n".join(lines))
+        
+        mock_completion.side_effect = fake_completion
+        
+        detector = TrustworthinessDetector(
+            model="gemini/gemini-pro",
+            fused_reflection=False,
+            early_exit=True,
+            batch_size=3
+        )
+        qa_pairs = [("Q1", "right"), ("Q2", "wrong"), ("Q3", "right")]
+        
+        scores = detector.batch_evaluate(qa_pairs, show_progress=False)
+        
+        assert scores == [1.0, 0.0, 1.0]
+        assert mock_completion.call_count == 2
+        assert prompts[1].count("Proposed Answer:") == 2
+        assert "wrong" not in prompts[1]
+    
+    def test_parse_batched_response(self, caplog):
+        """Test batched response parsing with missing and out-of-range items."""
+        detector = TrustworthinessDetector()
+        response = "item 1 answer: A\nItem 3 Answer: (C)\nitem 9 answer: [B]"
+        
+        with caplog.at_level("WARNING", logger="src.trustworthiness.detector"):
+            assert detector._parse_batched_response(response, 3) == [1.0, 0.5, 0.5]
+            # Answers in the single-pair fused format can't be attributed to items
+            fused = detector._parse_batched_fused_response("first: [B]\nsecond: [B]", 1)
+            assert fused == [0.5, 0.5]
+        
+        messages = [record.getMessage() for record in caplog.records]
+        assert len([m for m in messages if m.startswith("Could not parse response")]) == 2
+    
+    def test_batched_prompt_single_output_format(self):
+        """Test that batched prompts carry one batch-level output format, not one per item."""
+        detector = TrustworthinessDetector(batch_size=3)
+        pairs = [("Q1", "A1"), ("Q2", "A2"), ("Q3", "A3")]
+        
+        for fused in (True, False):
+            detector.fused_reflection = fused
+            [call, *_] = detector._plan_batch_calls(pairs, [0, 1, 2], [[None, None] for _ in pairs])
+            
+            assert call.prompt.count("Proposed Answer:") == 3
+            assert call.prompt.count("the output should strictly use") == 1
+            assert "The output should strictly use" not in call.prompt
+            assert "item i first:" in call.prompt if fused else "item i answer:" in call.prompt
+    
+    @patch('litellm.acompletion')
     def test_error_handling(self, mock_completion):
         """Test error handling when LLM fails."""
         # Simulate API error
         mock_completion.side_effect = Exception("API Error")
         
-        detector = TrustworthinessDetector(model="gemini/gemini-pro")
+        detector = TrustworthinessDetector(model="gemini/gemini-pro", num_retries=0)
         score = detector.get_trustworthiness_score("What is 2+2?", "4")
         
         # Should return 0.5 (uncertain) when API fails
         assert score == 0.5
     
+    @patch('litellm.acompletion')
+    def test_fallback_model(self, mock_completion):
+        """Test that calls fall back to the secondary model when the primary fails."""
+        async def fake_completion(**kwargs):
+            if kwargs["model"] == "gemini/gemini-pro":
+                raise Exception("Rate limited")
+            return mock_llm_response("first: [A], second: [A]")
+        
+        mock_completion.side_effect = fake_completion
+        
+        detector = TrustworthinessDetector(
+            model="gemini/gemini-pro",
+            fallback_model="gpt-3.5-turbo",
+            rpm=60,
+            num_retries=0
+        )
+        score = detector.get_trustworthiness_score("What is 2+2?", "4")
+        
+        assert score == 1.0
+        assert mock_completion.call_args.kwargs["model"] == "gpt-3.5-turbo"
+    
+    @patch('litellm.acompletion')
+    def test_shared_http_client(self, mock_completion):
+        """Test that sync calls share one event loop and connection pool until closed."""
+        import litellm
+        mock_completion.return_value = mock_llm_response("first: [A], second: [A]")
+        
+        litellm.aclient_session = None
+        detector = TrustworthinessDetector(model="gemini/gemini-pro", cache_responses=False)
+        
+        detector.get_trustworthiness_score("What is 2+2?", "4")
+        [(loop, client)] = detector._http_clients.items()
+        detector.batch_evaluate([("What is 3+3?", "6")], show_progress=False)
+        
+        # The pool is passed per call instead of being published to litellm globally
+        assert all(call.kwargs["client"] is client for call in mock_completion.call_args_list)
+        assert detector._http_clients == {loop: client}
+        assert litellm.aclient_session is None
+        
+        detector.close()
+        assert client._client.is_closed
+        assert loop.is_closed()
+        assert detector._http_clients == {}
+    
+    @patch('litellm.acompletion')
+    def test_pools_of_finished_loops_are_dropped(self, mock_completion):
+        """Test that repeated asyncio.run calls don't pile up pools, and close() closes the rest."""
+        mock_completion.return_value = mock_llm_response("first: [A], second: [A]")
+        detector = TrustworthinessDetector(model="gemini/gemini-pro", cache_responses=False)
+        
+        async def score_in_loop():
+            # A sync call from inside a running loop goes through the worker thread
+            return detector.get_trustworthiness_score("What is 1+1?", "2")
+        
+        detector.get_trustworthiness_score("What is 2+2?", "4")
+        asyncio.run(score_in_loop())
+        for i in range(3):
+            asyncio.run(detector.aget_trustworthiness_score(f"What is {i}+{i}?", str(2 * i)))
+        
+        # Sync loop, worker-thread loop and the latest asyncio.run loop
+        assert len(detector._http_clients) == 3
+        clients = list(detector._http_clients.values())
+        
+        detector.close()
+        assert detector._http_clients == {}
+        assert all(client._client.is_closed for client in clients[:2])
+    
+    @patch('litellm.acompletion')
+    def test_sync_calls_from_threads(self, mock_completion):
+        """Test that threads sharing a detector each run on their own loop and pool."""
+        from concurrent.futures import ThreadPoolExecutor
+        
+        async def fake_completion(**kwargs):
+            # Pooled clients must only be used on the loop that created them
+            assert detector._http_clients[asyncio.get_running_loop()] is kwargs["client"]
+            await asyncio.sleep(0.01)
+            return mock_llm_response("first: [A], second: [A]")
+        
+        mock_completion.side_effect = fake_completion
+        
+        detector = TrustworthinessDetector(model="gemini/gemini-pro", cache_responses=False)
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            scores = list(pool.map(
+                lambda i: detector.get_trustworthiness_score(f"What is {i}+{i}?", str(2 * i)),
+                range(8)
+            ))
+        
+        assert scores == [1.0] * 8
+        assert len(detector._http_clients) == len(detector._sync_loops) <= 4
+        
+        loops = list(detector._sync_loops)
+        detector.close()
+        assert all(loop.is_closed() for loop in loops)
+        assert detector._http_clients == {}
+    
+    @patch('litellm.acompletion')
+    def test_async_context_manager(self, mock_completion):
+        """Test that the async context manager closes the connection pool."""
+        mock_completion.return_value = mock_llm_response("first: [A], second: [A]")
+        
+        async def run():
+            async with TrustworthinessDetector(model="gemini/gemini-pro") as detector:
+                score = await detector.aget_trustworthiness_score("What is 2+2?", "4")
+                [client] = detector._http_clients.values()
+            return detector, client, score
+        
+        detector, client, score = asyncio.run(run())
+        assert score == 1.0
+        assert client._client.is_closed
+        assert detector._http_clients == {}
+    
+    def test_litellm_imported_lazily(self):
+        """Test that importing and constructing the detector doesn't import litellm."""
+        import subprocess
+        code = (
+            "import sys; from src.trustworthiness import TrustworthinessDetector; "
+            "TrustworthinessDetector(model='gemini/gemini-pro'); "
+            "print('litellm' in sys.modules)"
+        )
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True, text=True, cwd=root,
+            env={**os.environ, "GEMINI_API_KEY": "test-key"}
+        )
+        
+        assert result.stdout.strip() == "False", result.stderr
+    
+    @patch('litellm.acompletion')
+    def test_warnings_are_logged(self, mock_completion, caplog):
+        """Test that failures are reported through logging, not stdout."""
+        mock_completion.side_effect = Exception("API Error")
+        
+        detector = TrustworthinessDetector(
+            model="gemini/gemini-pro",
+            fused_reflection=False,
+            num_retries=0
+        )
+        with caplog.at_level("WARNING", logger="src.trustworthiness.detector"):
+            detector.get_trustworthiness_score("What is 2+2?", "4")
+            detector._parse_reflection_response("no letter here")
+        
+        messages = [record.getMessage() for record in caplog.records]
+        assert messages.count("LLM query failed: API Error") == 2
+        assert "Could not parse response: no letter here..." in messages
+    
     def test_clear_cache(self):
         """Test cache clearing functionality."""
         detector = TrustworthinessDetector(cache_responses=True)
@@ -212,27 +835,29 @@ class TestTrustworthinessDetector:
         """Test that caching can be disabled."""
         detector = TrustworthinessDetector(cache_responses=False)
         
-        assert detector._cache is None
+        assert isinstance(detector._cache, NullCache)
         
         # Should not crash when trying to use cache operations
+        detector._cache["test1"] = 0.8
+        assert "test1" not in detector._cache
+        assert len(detector._cache) == 0
         detector.clear_cache()  # Should do nothing
 
 
 class TestConvenienceFunction:
     """Test the convenience function."""
     
-    @patch('litellm.completion')
+    @patch('litellm.acompletion')
     def test_evaluate_trustworthiness(self, mock_completion):
         """Test the standalone evaluation function."""
-        mock_response = Mock()
-        mock_response.choices = [Mock(message=Mock(content="answer: [A]"))]
+        mock_response = mock_llm_response("first: [A], second: [A]")
         mock_completion.return_value = mock_response
         
         score = evaluate_trustworthiness("What is 2+2?", "4", model="gemini/gemini-pro")
         
         assert isinstance(score, float)
         assert 0 <= score <= 1
-        assert mock_completion.call_count == 2  # Two reflection prompts
+        assert mock_completion.call_count == 1  # Both reflection prompts fused
 
 
 class TestPrompts:
@@ -250,6 +875,24 @@ class TestPrompts:
             assert "(B)" in prompt
             assert "(C)" in prompt
     
+    def test_compiled_prompt_rendering(self):
+        """Test that precompiled templates render exactly like str.format."""
+        from src.trustworthiness.detector import _compile_prompt, _render_prompt
+        
+        question = "What is {2+2}?"
+        answer = "4 {answer}"
+        for prompt in REFLECTION_PROMPTS + ["{{literal}} {question}/{answer}"]:
+            rendered = _render_prompt(_compile_prompt(prompt), question, answer)
+            assert rendered == prompt.format(question=question, answer=answer)
+        
+        with pytest.raises(ValueError, match="Unsupported placeholder"):
+            _compile_prompt("{question} {context}")
+        # Conversions and format specs would be silently dropped, so they are rejected too
+        with pytest.raises(ValueError, match=r"\{answer!r\}"):
+            _compile_prompt("{question} {answer!r}")
+        with pytest.raises(ValueError, match=r"\{question:>40\}"):
+            _compile_prompt("{question:>40} {answer}")
+    
     def test_prompt_formatting(self):
         """Test that prompts can be formatted correctly."""
         question = "What is 2+2?"